@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Os módulos de utils/ leem 'zomato.csv' pelo caminho relativo à raiz do projeto
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
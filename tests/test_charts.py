@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+from utils.charts import WEBGL_THRESHOLD, create_bar_chart, create_ranking_chart, figure_size
+
+def large_frame(n=WEBGL_THRESHOLD * 3):
+    return pd.DataFrame({'label': [f'Restaurante {i}' for i in range(n)], 'value': np.linspace(0, 5, n)})
+
+def test_webgl_ranking_is_not_larger_than_funnel():
+    data = large_frame()
+    fig = create_ranking_chart(data, 'label', 'value', max_categories=None, marker={'color': '#008B8B'})
+    funnel = go.Figure(go.Funnel(y=data['label'].to_numpy(), x=data['value'].to_numpy(), marker={'color': '#008B8B'}))
+
+    assert isinstance(fig.data[0], go.Scattergl)
+    assert len(fig.data[0].y) == len(data)
+    assert figure_size(fig) <= figure_size(funnel) * 1.05
+
+def test_webgl_bar_chart_keeps_colorscale():
+    data = large_frame()
+    fig = create_bar_chart(data, 'label', 'value', 'título', color='value', color_continuous_scale='viridis', max_categories=None)
+
+    trace = fig.data[0]
+    assert isinstance(trace, go.Scattergl)
+    assert trace.marker.colorscale is not None
+    assert len(trace.marker.color) == len(data)
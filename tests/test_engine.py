@@ -0,0 +1,167 @@
+import random
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import engine
+from utils.data import FLAG_COLUMNS, MemoryBudget, MemoryBudgetExceeded, country_name, load_data
+from utils.engine import Query
+
+#===================================================
+# Seleções
+#===================================================
+
+def default_queries():
+    """Filtros padrão das barras laterais de cada página (e a tabela inteira dos rankings)."""
+    max_rating = float(load_data()['Aggregate rating'].max())
+    return {
+        'Cidade': Query.from_sidebar(['Brazil'], ['Home-made'], ['São Paulo']),
+        'Pais': Query.from_sidebar(['Brazil'], ['Home-made'], ['São Paulo']),
+        'Restaurantes': Query.from_sidebar(['Brazil'], ['Home-made'], max_rating=max_rating),
+        'Tipos_de_Culinaria': Query.from_sidebar(['Brazil'], ['Home-made'], max_rating=max_rating),
+        'tabela inteira': Query(),
+    }
+
+def random_queries(n=8, seed=0):
+    """Seleções aleatórias (reprodutíveis) combinando todos os filtros."""
+    df = load_data()
+    rng = random.Random(seed)
+    cuisines = sorted(df['Cuisines'].unique())
+    cities = sorted(df['City'].unique())
+    queries = {}
+    for i in range(n):
+        countries = rng.sample(country_name(), rng.randint(1, 4)) if rng.random() < 0.7 else []
+        query = Query.from_sidebar(
+            countries,
+            rng.sample(cuisines, rng.randint(5, 40)),
+            rng.sample(cities, rng.randint(5, 60)),
+            max_rating=rng.choice([None, 3.5, 4.0, 4.5]),
+        )
+        if rng.random() < 0.3:
+            query = replace(query, rating_above=3.5)
+        queries[f'aleatoria-{i}'] = query
+    return queries
+
+def populated_queries():
+    """Seleções grandes (os filtros padrão do Brasil selecionam poucas linhas)."""
+    cuisines = load_data()['Cuisines'].unique().tolist()
+    return {
+        'India, todas as culinárias': Query.from_sidebar(['India'], cuisines),
+        'India e Brasil, nota até 4.5': Query.from_sidebar(['India', 'Brazil'], cuisines, max_rating=4.5),
+        'cidades, North Indian e Chinese': Query.from_sidebar([], ['North Indian', 'Chinese'], ['New Delhi', 'Gurgaon', 'Noida']),
+    }
+
+QUERIES = {**default_queries(), **populated_queries(), **random_queries()}
+
+def reference_frame(query):
+    """Seleção feita como as páginas faziam antes do motor: filtros pandas sobre a tabela."""
+    df = load_data()
+    selected = df
+    if query.countries is not None:
+        selected = selected[selected['Country'].isin(query.countries)]
+    if query.cuisines is not None:
+        selected = selected[selected['Cuisines'].isin(query.cuisines)]
+    if query.cities is not None:
+        selected = selected[selected['City'].isin(query.cities)]
+    if query.max_rating is not None:
+        selected = selected[selected['Aggregate rating'] <= query.max_rating]
+    if query.rating_below is not None:
+        selected = selected[selected['Aggregate rating'] < query.rating_below]
+    if query.rating_above is not None:
+        selected = selected[selected['Aggregate rating'] > query.rating_above]
+    return selected
+
+def as_series(frame, key, value):
+    return frame.set_index(key)[value].sort_index()
+
+#===================================================
+# Agregações
+#===================================================
+
+@pytest.mark.parametrize('name', QUERIES)
+def test_count_by_matches_groupby(name):
+    query = QUERIES[name]
+    expected = reference_frame(query).groupby('City').size().sort_index()
+    result = as_series(engine.count_by(query, 'City'), 'City', 'count')
+    pd.testing.assert_series_equal(result, expected, check_names=False, check_dtype=False)
+
+@pytest.mark.parametrize('name', QUERIES)
+def test_distinct_by_matches_nunique(name):
+    query = QUERIES[name]
+    expected = reference_frame(query).groupby('Country')['City'].nunique().sort_index()
+    result = as_series(engine.distinct_by(query, 'City', 'Country'), 'Country', 'City')
+    pd.testing.assert_series_equal(result, expected, check_names=False, check_dtype=False)
+
+@pytest.mark.parametrize('name', QUERIES)
+@pytest.mark.parametrize('metric, by', [('Aggregate rating', 'Cuisines'), ('Average Cost for two', 'Country')])
+def test_mean_by_matches_groupby_mean(name, metric, by):
+    query = QUERIES[name]
+    expected = reference_frame(query).groupby(by)[metric].mean().sort_index()
+    result = as_series(engine.mean_by(query, metric, by), by, metric)
+    pd.testing.assert_series_equal(result, expected, check_names=False)
+
+@pytest.mark.parametrize('metric, by', [('Aggregate rating', 'Price range'), ('Average Cost for two', 'Restaurant Name')])
+def test_approximate_mean_by_unsupported_dimension_falls_back_to_exact(metric, by):
+    query = Query(countries=('India', 'Brazil'), approximate=True)
+    pd.testing.assert_frame_equal(engine.mean_by(query, metric, by), engine.mean_by(query.exact(), metric, by))
+
+def test_approximate_distinct_by_unsupported_dimension_falls_back_to_exact():
+    query = Query(approximate=True)
+    pd.testing.assert_frame_equal(engine.distinct_by(query, 'City', 'Price range'), engine.distinct_by(query.exact(), 'City', 'Price range'))
+
+@pytest.mark.parametrize('name', QUERIES)
+def test_top_by_cuisine_matches_idxmax(name):
+    query = QUERIES[name]
+    selected = reference_frame(query)
+    best = selected.loc[selected.groupby('Cuisines')['Aggregate rating'].idxmax()]
+    result = engine.top_by_cuisine(query, 1)
+
+    # Mesmas culinárias e mesma nota máxima que o idxmax; o restaurante escolhido desempata pelos votos
+    assert result['Cuisines'].tolist() == best['Cuisines'].tolist()
+    np.testing.assert_allclose(result['Aggregate rating'], best['Aggregate rating'])
+    by_votes = selected.sort_values(['Aggregate rating', 'Votes'], ascending=False, kind='stable').groupby('Cuisines').head(1)
+    assert result['Restaurant Name'].tolist() == by_votes.sort_values('Cuisines', kind='stable')['Restaurant Name'].tolist()
+
+@pytest.mark.parametrize('name', QUERIES)
+def test_top_by_cuisine_top_n(name):
+    query = QUERIES[name]
+    expected = (
+        reference_frame(query)
+        .sort_values(['Aggregate rating', 'Votes'], ascending=False, kind='stable')
+        .groupby('Cuisines').head(3)
+        .sort_values('Cuisines', kind='stable')
+    )
+    result = engine.top_by_cuisine(query, 3)
+    assert result['Restaurant Name'].tolist() == expected['Restaurant Name'].tolist()
+    assert result['Votes'].tolist() == expected['Votes'].tolist()
+
+@pytest.mark.parametrize('name', QUERIES)
+@pytest.mark.parametrize('column', FLAG_COLUMNS)
+def test_flag_counts_match_value_counts(name, column):
+    query = QUERIES[name]
+    expected = reference_frame(query)[column].value_counts().to_dict()
+    result = engine.flag_counts(query, column)
+    assert dict(zip(result[column], result['count'])) == expected
+
+#===================================================
+# Orçamento de memória
+#===================================================
+
+def test_rows_charges_budget_before_copying(monkeypatch):
+    budget = MemoryBudget(limit_mb=0.001)
+    monkeypatch.setattr(engine, 'active_budget', lambda: budget)
+    monkeypatch.setattr(engine, 'select', lambda *args: pytest.fail('a cópia foi alocada acima do teto'))
+    with pytest.raises(MemoryBudgetExceeded):
+        engine.rows(Query(), ['Restaurant Name', 'Address'])
+
+def test_aggregations_do_not_charge_budget(monkeypatch):
+    budget = MemoryBudget(limit_mb=0)
+    monkeypatch.setattr(engine, 'active_budget', lambda: budget)
+    query = Query(countries=('Brazil', 'India'), rating_above=1.0)
+    engine.count_by(query, 'City')
+    engine.distinct_by(query, 'City', 'Country')
+    engine.mean_by(query, 'Aggregate rating', 'Cuisines')
+    engine.flag_crosstab(query)
+    assert budget.current_bytes == 0
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from utils import prerender
+from utils.data import load_data
+from utils.engine import Query
+from utils.prerender import load_prerendered, render_selection
+
+def page_queries(country):
+    """Consultas que as páginas montam com os filtros padrão da barra lateral."""
+    max_note = load_data()['Aggregate rating'].max()
+    return {
+        'Pais': Query.from_sidebar([country], ['Home-made'], ['São Paulo'], approximate=False),
+        'Tipos_de_Culinaria': Query.from_sidebar([country], ['Home-made'], max_rating=max_note),
+    }
+
+def default_selections(country):
+    return [selection for selection in prerender.default_matrix() if selection['countries'] == [country]]
+
+@pytest.fixture(scope='module')
+def rendered(tmp_path_factory):
+    output_dir = str(tmp_path_factory.mktemp('prerendered'))
+    keys = [render_selection(selection, output_dir) for selection in default_selections('India')]
+    return output_dir, keys
+
+@pytest.mark.parametrize('page', prerender.PAGES)
+def test_page_query_loads_prerendered_artifacts(rendered, page):
+    output_dir, keys = rendered
+    query = page_queries('India')[page]
+    assert prerender.selection_key(page, query) in keys
+
+    artifacts = load_prerendered(page, query, output_dir)
+    assert artifacts is not None
+    assert artifacts['figures']
+    assert ('map_html' if page == 'Pais' else 'best_restaurants') in artifacts
+
+def test_rerender_replaces_directory_without_leftovers(rendered):
+    output_dir, keys = rendered
+    render_selection(default_selections('India')[0], output_dir)
+    assert sorted(os.listdir(output_dir)) == sorted(keys)
+
+@pytest.mark.parametrize('page', prerender.PAGES)
+def test_stale_fingerprint_is_rejected(rendered, monkeypatch, page):
+    output_dir, _ = rendered
+    monkeypatch.setattr(prerender, 'data_fingerprint', lambda: 'outro-arquivo')
+    assert load_prerendered(page, page_queries('India')[page], output_dir) is None
+
+def test_unreadable_artifact_falls_back_to_live(tmp_path):
+    selection = default_selections('Brazil')[1]
+    key = render_selection(selection, str(tmp_path))
+    manifest = tmp_path / key / 'manifest.json'
+    assert selection['page'] == 'Tipos_de_Culinaria' and manifest.exists()
+
+    # Gráfico gravado pela metade com o manifesto ainda válido
+    (tmp_path / key / 'reservas.json').write_text('{"data": [', encoding='utf-8')
+    assert load_prerendered(selection['page'], page_queries('Brazil')[selection['page']], str(tmp_path)) is None
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from utils import profiling
+from utils.profiling import RunProfiler
+
+class ExclusiveProfile:
+    """cProfile.Profile com a restrição do Python 3.12+: um único perfil ativo no interpretador."""
+
+    active = None
+
+    def enable(self):
+        if ExclusiveProfile.active is not None:
+            raise ValueError('Another profiling tool is already active')
+        ExclusiveProfile.active = self
+
+    def disable(self):
+        if ExclusiveProfile.active is self:
+            ExclusiveProfile.active = None
+
+    def dump_stats(self, path):
+        open(path, 'wb').close()
+
+@pytest.fixture
+def exclusive_profile(monkeypatch):
+    monkeypatch.setattr(profiling.cProfile, 'Profile', ExclusiveProfile)
+    yield
+    ExclusiveProfile.active = None
+
+def test_concurrent_reruns_profile_one_and_skip_the_other(tmp_path, exclusive_profile):
+    started, release = threading.Barrier(2), threading.Event()
+    results, errors = {}, []
+
+    def rerun(name):
+        profiler = RunProfiler(threshold_ms=0, output_dir=str(tmp_path))
+        try:
+            profiled = profiler.begin_run(name)
+            started.wait(timeout=5)
+            if profiled:
+                release.wait(timeout=5)  # mantém o perfil ativo enquanto o outro rerun começa
+            else:
+                release.set()
+            results[name] = (profiled, profiler.finish())
+        except Exception as e:
+            errors.append(e)
+            release.set()
+
+    threads = [threading.Thread(target=rerun, args=(name,)) for name in ('Pais', 'Cidade')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert errors == []
+    assert sorted(profiled for profiled, _ in results.values()) == [False, True]
+    assert sorted(path is None for _, path in results.values()) == [False, True]
+    assert len(list(tmp_path.glob('*.prof'))) == 1
+
+def test_profiling_is_released_after_each_rerun(tmp_path, exclusive_profile):
+    first, second = RunProfiler(threshold_ms=0, output_dir=str(tmp_path)), RunProfiler(threshold_ms=0, output_dir=str(tmp_path))
+    assert first.begin_run('Pais')
+    assert not second.begin_run('Cidade')
+    assert second.finish() is None
+    assert first.finish() is not None
+    assert second.begin_run('Cidade')
+    assert second.finish() is not None
+
+def test_other_profiling_tool_is_skipped(tmp_path, exclusive_profile):
+    ExclusiveProfile.active = object()  # perfilador externo ao app
+    profiler = RunProfiler(threshold_ms=0, output_dir=str(tmp_path))
+    assert not profiler.begin_run('Pais')
+    assert profiler.finish() is None
+    ExclusiveProfile.active = None
+    assert profiler.begin_run('Pais')
+    profiler.finish()
@@ -0,0 +1,46 @@
+import pytest
+
+from utils.data import load_data
+from utils.search import SearchIndex, normalize
+
+@pytest.fixture(scope='module')
+def df():
+    return load_data()
+
+@pytest.fixture(scope='module')
+def index(df):
+    return SearchIndex(df)
+
+def test_normalize_folds_accents_case_and_spaces():
+    assert normalize('  São   PAULO ') == 'sao paulo'
+
+def test_accent_folded_query_ranks_city_first(index):
+    for query in ['sao', 'São', 'SAO PAU']:
+        first = index.search(query).iloc[0]
+        assert (first['Field'], first['Value']) == ('City', 'São Paulo')
+
+def test_prefix_of_last_word_matches(index):
+    results = index.search('banga', fields=['City'])
+    assert results.iloc[0]['Value'] == 'Bangalore'
+
+@pytest.mark.parametrize('query, field, expected', [
+    ('piza hut', 'Restaurant Name', 'Pizza Hut'),
+    ('nrth indian', 'Cuisines', 'North Indian'),
+])
+def test_typo_matches_by_trigrams(index, query, field, expected):
+    first = index.search(query).iloc[0]
+    assert (first['Field'], first['Value']) == (field, expected)
+
+def test_fields_filter_excludes_other_fields(index):
+    results = index.search('new delhi', fields=['City'])
+    assert not results.empty
+    assert set(results['Field']) == {'City'}
+
+def test_chain_lists_each_branch(df, index):
+    results = index.search('burger king', fields=['Restaurant Name'])
+    assert (results['Value'] == 'Burger King').all()
+    assert results['Row'].is_unique
+    assert df.loc[results['Row'], 'City'].nunique() > 1
+
+def test_empty_query_returns_no_results(index):
+    assert index.search('   ').empty
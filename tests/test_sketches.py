@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from utils.data import filter_mask, load_data
+from utils.sketches import SketchStore, hll_relative_error
+
+# Valores do slider nos limites das faixas de nota (inclusive os que caíam fora do bin logarítmico)
+BOUNDARY_RATINGS = [2.5, 3.5, 3.6, 3.7, 3.9, 4.0, 4.4, 4.5, 4.8, 4.9]
+
+@pytest.fixture(scope='module')
+def df():
+    return load_data()
+
+@pytest.fixture(scope='module')
+def store(df):
+    return SketchStore(df)
+
+@pytest.mark.parametrize('max_rating', BOUNDARY_RATINGS)
+def test_mean_rating_with_rating_filter_matches_exact(df, store, max_rating):
+    cuisines = df['Cuisines'].unique().tolist()
+    approximate = store.query(countries=['India'], cuisines=cuisines, max_rating=max_rating).mean('Aggregate rating', by='Cuisines')
+    mask = filter_mask(df, countries=['India'], cuisines=cuisines, max_rating=max_rating)
+    exact = df.loc[mask].groupby('Cuisines')['Aggregate rating'].mean()
+
+    approximate = approximate.set_index('Cuisines')['Aggregate rating']
+    assert set(approximate.index) == set(exact.index)
+    np.testing.assert_allclose(approximate.loc[exact.index].to_numpy(), exact.to_numpy(), rtol=1e-9)
+
+def test_mean_without_rating_filter_matches_exact(df, store):
+    approximate = store.query(countries=['India', 'Brazil']).mean('Average Cost for two', by='Country')
+    exact = df[df['Country'].isin(['India', 'Brazil'])].groupby('Country')['Average Cost for two'].mean()
+
+    approximate = approximate.set_index('Country')['Average Cost for two']
+    assert set(approximate.index) == set(exact.index)
+    np.testing.assert_allclose(approximate.loc[exact.index].to_numpy(), exact.to_numpy(), rtol=1e-9)
+
+def test_distinct_cities_within_hll_bound(df, store):
+    approximate = store.query().distinct('City', by='Country').set_index('Country')['City']
+    exact = df.groupby('Country')['City'].nunique()
+
+    assert set(approximate.index) == set(exact.index)
+    relative_error = np.abs(approximate.loc[exact.index].to_numpy() - exact.to_numpy()) / exact.to_numpy()
+    assert relative_error.max() <= 3 * hll_relative_error()
+
+def test_price_mean_with_rating_filter_is_unsupported(store):
+    with pytest.raises(ValueError):
+        store.query(countries=['India'], max_rating=4.0).mean('Average Cost for two', by='Country')
@@ -0,0 +1,116 @@
+"""Camada de renderização de gráficos com controle do tamanho do payload.
+
+Os gráficos são montados com arrays numéricos compactos (em vez de passar
+DataFrames inteiros ao Plotly Express), limitam a quantidade de categorias
+agrupando o excedente em "Outros" e, sem limite de categorias, passam a
+desenhar as barras em um único trace WebGL acima de um limite de pontos.
+Com ``FOME_ZERO_CHART_TELEMETRY=1``, o tamanho serializado de cada figura é
+registrado.
+"""
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import plotly.io as pio
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+#===================================================
+# Constantes
+#===================================================
+
+MAX_CATEGORIES = 30
+OTHERS_LABEL = 'Outros'
+WEBGL_THRESHOLD = 1000
+
+CHART_TELEMETRY_ENV = 'FOME_ZERO_CHART_TELEMETRY'
+
+#===================================================
+# Redução do payload
+#===================================================
+
+def cap_categories(data, x, y, max_categories=MAX_CATEGORIES, others='sum', ascending=False):
+    """Função para manter as ``max_categories`` maiores (ou menores) categorias e agrupar o restante em "Outros".
+
+    ``others`` define como o bucket é agregado: 'sum' para contagens e 'mean'
+    (média simples das categorias agrupadas) para médias. A ordem original
+    das categorias mantidas é preservada.
+    """
+    if max_categories is None or len(data) <= max_categories:
+        return data
+    values = data[y].to_numpy()
+    order = np.argsort(values if ascending else -values, kind='stable')
+    keep = np.zeros(len(data), dtype=bool)
+    keep[order[:max_categories - 1]] = True
+    rest = values[~keep]
+    bucket = pd.DataFrame({x: [OTHERS_LABEL], y: [rest.sum() if others == 'sum' else rest.mean()]})
+    return pd.concat([data.loc[keep, [x, y]], bucket], ignore_index=True)
+
+def webgl_bars(labels, values, horizontal=False, marker=None, opacity=None):
+    """Função para desenhar barras em um único trace WebGL, enviando cada categoria uma única vez.
+
+    O Plotly não tem barras em WebGL; cada barra vira um marcador no valor com
+    uma barra de erro de 100% até zero (``type='percent'``, sem array extra),
+    o que mantém a leitura de gráfico de barras com milhares de categorias.
+    Os valores devem ser não negativos.
+    """
+    width = float(np.clip(1600 / max(len(labels), 1), 1, 8))
+    marker = {'size': width, **(marker or {})}
+    error = dict(type='percent', symmetric=False, value=0, valueminus=100, width=0, thickness=width)
+    if isinstance(marker.get('color'), str):
+        error['color'] = marker['color']
+    coords = dict(x=values, y=labels, error_x=error) if horizontal else dict(x=labels, y=values, error_y=error)
+    return go.Scattergl(**coords, mode='markers', marker=marker, opacity=opacity)
+
+def create_bar_chart(data, x, y, title, color=None, color_continuous_scale=None, max_categories=MAX_CATEGORIES, others='sum', ascending=False):
+    """Função para criar um gráfico de barras a partir de arrays compactos."""
+    data = cap_categories(data, x, y, max_categories=max_categories, others=others, ascending=ascending)
+    labels = data[x].to_numpy()
+    values = data[y].to_numpy()
+
+    marker = {}
+    if color is not None and color in data and pd.api.types.is_numeric_dtype(data[color]):
+        marker = dict(color=data[color].to_numpy(), colorscale=color_continuous_scale, showscale=True, colorbar=dict(title=color))
+
+    if len(labels) > WEBGL_THRESHOLD:
+        trace = webgl_bars(labels, values, marker=marker)
+    else:
+        trace = go.Bar(x=labels, y=values, marker=marker)
+
+    fig = go.Figure(trace)
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    return fig
+
+def create_ranking_chart(data, label, value, max_categories=MAX_CATEGORIES, ascending=False, **trace_kwargs):
+    """Função para criar um gráfico de funil horizontal, trocado por barras WebGL acima do limite de pontos."""
+    data = cap_categories(data, label, value, max_categories=max_categories, others='mean', ascending=ascending)
+    labels = data[label].to_numpy()
+    values = data[value].to_numpy()
+    if len(labels) > WEBGL_THRESHOLD:
+        trace = webgl_bars(labels, values, horizontal=True, marker=trace_kwargs.get('marker'), opacity=trace_kwargs.get('opacity'))
+    else:
+        trace = go.Funnel(y=labels, x=values, **trace_kwargs)
+    return go.Figure(trace)
+
+#===================================================
+# Renderização e telemetria
+#===================================================
+
+def figure_size(fig):
+    """Função para retornar o tamanho, em bytes, da figura serializada em JSON."""
+    return len(pio.to_json(fig, validate=False).encode())
+
+def telemetry_enabled():
+    """Função para verificar se a telemetria de payload dos gráficos foi ativada."""
+    return os.environ.get(CHART_TELEMETRY_ENV, '').lower() in {'1', 'true', 'yes', 'on'}
+
+def plotly_chart(fig, label, **kwargs):
+    """Função para exibir um gráfico; com a telemetria ativa, registra o tamanho do payload em st.session_state['chart_payloads']."""
+    if telemetry_enabled():
+        size = figure_size(fig)
+        st.session_state.setdefault('chart_payloads', {})[label] = size
+        logger.info("payload do gráfico %s: %d bytes", label, size)
+    return st.plotly_chart(fig, **kwargs)
@@ -0,0 +1,173 @@
+import hashlib
+import logging
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger(__name__)
+
+#===================================================
+# Constantes
+#===================================================
+
+DATA_PATH = 'zomato.csv'
+
+COUNTRIES = {
+    1: "India", 14: "Australia", 30: "Brazil", 37: "Canada",
+    94: "Indonesia", 148: "New Zealand", 162: "Philippines",
+    166: "Qatar", 184: "Singapore", 189: "South Africa",
+    191: "Sri Lanka", 208: "Turkey", 214: "United Arab Emirates",
+    215: "England", 216: "United States of America"
+}
+
+# Colunas booleanas (0/1) empacotadas na coluna 'Flags': o bit i corresponde a FLAG_COLUMNS[i]
+FLAG_COLUMNS = ['Has Online delivery', 'Has Table booking', 'Is delivering now', 'Switch to order menu']
+
+# Teto de memória por sessão (em MB), configurável por variável de ambiente
+MEMORY_BUDGET_ENV = 'FOME_ZERO_MEMORY_BUDGET_MB'
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+#===================================================
+# Carregamento dos dados
+#===================================================
+
+def clean_data(df):
+    """Função para limpeza dos dados do DataFrame."""
+    df["Cuisines"] = df["Cuisines"].astype(str).str.split(",").str[0]
+    df.dropna(inplace=True)
+    df.drop_duplicates(inplace=True)
+    return df
+
+def pack_flags(df, columns=FLAG_COLUMNS):
+    """Função para empacotar colunas booleanas (0/1) em uma máscara de bits uint8."""
+    flags = np.zeros(len(df), dtype=np.uint8)
+    for bit, column in enumerate(columns):
+        flags |= (df[column].to_numpy() != 0).astype(np.uint8) << bit
+    return flags
+
+def has_flag(flags, column):
+    """Função para extrair de uma máscara de bits o valor 0/1 de uma das FLAG_COLUMNS."""
+    return (np.asarray(flags) >> FLAG_COLUMNS.index(column)) & 1
+
+@st.cache_resource
+def load_data(path=DATA_PATH):
+    """Função para carregar, limpar e enriquecer a tabela compartilhada por todas as sessões.
+
+    O DataFrame retornado é o mesmo objeto para todas as páginas e sessões
+    (sem cópia por rerun), portanto não deve ser modificado. As colunas
+    derivadas, como 'Country' e a máscara de bits 'Flags', são calculadas uma
+    única vez aqui.
+    """
+    df = clean_data(pd.read_csv(path))
+    df['Country'] = df['Country Code'].map(COUNTRIES).fillna("Unknown")
+    df['Flags'] = pack_flags(df)
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+@lru_cache(maxsize=8)
+def _file_sha1(path, size, mtime_ns):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def data_fingerprint(path=DATA_PATH):
+    """Função para retornar a impressão digital (SHA-1 do conteúdo) do arquivo de dados.
+
+    O hash só é recalculado quando o tamanho ou a data de modificação do
+    arquivo mudam.
+    """
+    stat = os.stat(path)
+    return _file_sha1(path, stat.st_size, stat.st_mtime_ns)
+
+#===================================================
+# Filtros
+#===================================================
+
+def country_name(code=None):
+    """Função para retornar o nome do país com base no código, ou a lista de nomes sem código."""
+    if code is None:
+        return list(COUNTRIES.values())
+    return COUNTRIES.get(code, "Unknown")
+
+def country_codes(names):
+    """Função para retornar os códigos dos países a partir dos nomes."""
+    return [code for code, name in COUNTRIES.items() if name in names]
+
+def filter_mask(df, countries=None, cuisines=None, cities=None, max_rating=None, rating_below=None, rating_above=None):
+    """Função para calcular a máscara booleana da seleção sobre a tabela compartilhada.
+
+    Parâmetros com valor None não restringem a seleção. A máscara tem tamanho
+    fixo (uma posição por linha da tabela), independente do tamanho da seleção.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if countries is not None:
+        mask &= df['Country Code'].isin(country_codes(countries)).to_numpy()
+    if cuisines is not None:
+        mask &= df['Cuisines'].isin(cuisines).to_numpy()
+    if cities is not None:
+        mask &= df['City'].isin(cities).to_numpy()
+    if max_rating is not None:
+        mask &= (df['Aggregate rating'] <= max_rating).to_numpy()
+    if rating_below is not None:
+        mask &= (df['Aggregate rating'] < rating_below).to_numpy()
+    if rating_above is not None:
+        mask &= (df['Aggregate rating'] > rating_above).to_numpy()
+    return mask
+
+def select(df, mask, columns):
+    """Função para materializar apenas as colunas necessárias das linhas selecionadas."""
+    return df.loc[mask, list(columns)]
+
+#===================================================
+# Orçamento de memória por sessão
+#===================================================
+
+class MemoryBudgetExceeded(MemoryError):
+    """Erro levantado quando uma seleção ultrapassa o teto de memória da sessão."""
+
+class MemoryBudget:
+    """Contabiliza a memória alocada por rerun de uma sessão e aplica o teto configurado."""
+
+    def __init__(self, limit_mb=None):
+        if limit_mb is None:
+            limit_mb = float(os.environ.get(MEMORY_BUDGET_ENV, DEFAULT_MEMORY_BUDGET_MB))
+        self.limit_bytes = int(limit_mb * 1024 * 1024)
+        self.page = None
+        self.current_bytes = 0
+
+    def begin_run(self, page):
+        """Inicia a contabilização de um novo rerun."""
+        self.page = page
+        self.current_bytes = 0
+
+    def charge(self, label, nbytes):
+        """Registra ``nbytes`` que o rerun vai alocar e aplica o teto antes da alocação."""
+        self.current_bytes += nbytes
+        logger.info("memória %s/%s: %d bytes (total do rerun: %d)", self.page, label, nbytes, self.current_bytes)
+
+        if self.current_bytes > self.limit_bytes:
+            raise MemoryBudgetExceeded(
+                f"A seleção ocupa {self.current_bytes / 1024 ** 2:.1f} MB, acima do limite de "
+                f"{self.limit_bytes / 1024 ** 2:.1f} MB por sessão. Reduza os filtros selecionados."
+            )
+
+def session_budget(page):
+    """Função para obter o orçamento de memória da sessão atual e iniciar um novo rerun.
+
+    As páginas montam os gráficos logo em seguida, dentro de um ``try`` que
+    exibe MemoryBudgetExceeded e interrompe o rerun com st.stop().
+    """
+    if 'memory_budget' not in st.session_state:
+        st.session_state['memory_budget'] = MemoryBudget()
+    budget = st.session_state['memory_budget']
+    budget.begin_run(page)
+    return budget
+
+def active_budget():
+    """Função para retornar o orçamento da sessão em execução, ou None fora de uma sessão (ex.: pré-renderização)."""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    return st.session_state.get('memory_budget')
@@ -0,0 +1,255 @@
+"""Motor de consultas compartilhado por todas as páginas.
+
+As páginas descrevem a seleção com um ``Query`` (filtros de entrada) e
+recebem DataFrames já agregados (saída). Toda consulta passa por aqui, de
+modo que as otimizações valem para todas as páginas de uma vez:
+
+- a máscara de cada ``Query`` e cada agregação ficam em cache por processo
+  (os resultados são compartilhados e não devem ser modificados);
+- as agregações não copiam as linhas selecionadas: são ``np.bincount``
+  sobre códigos fatorados uma única vez por processo, ponderados pela
+  máscara, de modo que a memória de um rerun não cresce com a seleção;
+- apenas ``rows`` (linhas do mapa) materializa a seleção, e o tamanho
+  estimado da cópia é cobrado do orçamento da sessão antes de alocá-la;
+- com ``approximate=True``, contagens distintas e médias usam os sketches
+  pré-calculados de utils/sketches.py;
+- os melhores restaurantes por culinária vêm do ranking pré-ordenado de
+  utils/leaderboard.py, sem percorrer a tabela;
+- as análises de serviços (entrega online, reserva etc.) saem de um único
+  crosstab sobre a máscara de bits 'Flags'.
+"""
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data import FLAG_COLUMNS, active_budget, filter_mask, has_flag, load_data, select
+from utils.leaderboard import load_leaderboard
+from utils.sketches import load_sketches
+
+CACHE_SIZE = 256
+
+# Faixas de nota do crosstab de serviços (limites inferiores; nota 0 é "Not rated")
+RATING_BUCKETS = [0, 2.5, 3.5, 4.0, 4.5]
+RATING_BUCKET_LABELS = ['Not rated', 'Poor', 'Average', 'Good', 'Very Good', 'Excellent']
+PRICE_RANGES = 4
+CROSSTAB_SHAPE = (1 << len(FLAG_COLUMNS), len(RATING_BUCKET_LABELS), PRICE_RANGES)
+
+#===================================================
+# Consulta
+#===================================================
+
+@dataclass(frozen=True)
+class Query:
+    """Filtros de uma seleção. ``None`` significa "sem filtro" para aquele campo."""
+
+    countries: Optional[Tuple[str, ...]] = None
+    cuisines: Optional[Tuple[str, ...]] = None
+    cities: Optional[Tuple[str, ...]] = None
+    max_rating: Optional[float] = None
+    rating_below: Optional[float] = None
+    rating_above: Optional[float] = None
+    approximate: bool = False
+
+    @classmethod
+    def from_sidebar(cls, countries, cuisines, cities=None, max_rating=None, approximate=False):
+        """Cria a consulta a partir da barra lateral.
+
+        Sem países selecionados, a seleção é feita por culinária e cidade; com
+        países, por país e culinária. As listas são ordenadas para que seleções
+        equivalentes produzam a mesma consulta (e o mesmo cache).
+        """
+        countries = tuple(sorted(countries)) if countries else None
+        cities = tuple(sorted(cities)) if cities is not None and not countries else None
+        return cls(
+            countries=countries,
+            cuisines=tuple(sorted(cuisines)),
+            cities=cities,
+            max_rating=float(max_rating) if max_rating is not None else None,
+            approximate=approximate,
+        )
+
+    def filters(self):
+        """Retorna os filtros no formato de ``filter_mask``."""
+        return {
+            'countries': self.countries, 'cuisines': self.cuisines, 'cities': self.cities,
+            'max_rating': self.max_rating, 'rating_below': self.rating_below, 'rating_above': self.rating_above,
+        }
+
+    def exact(self):
+        """Retorna a mesma consulta no modo exato."""
+        return replace(self, approximate=False)
+
+    def to_dict(self):
+        """Retorna a consulta como dicionário serializável em JSON."""
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in asdict(self).items()}
+
+def _sketches(query):
+    """Retorna a consulta aproximada equivalente, ou None se a consulta não puder usar sketches."""
+    if not query.approximate or query.rating_below is not None or query.rating_above is not None:
+        return None
+    return load_sketches().query(
+        countries=query.countries, cuisines=query.cuisines, cities=query.cities, max_rating=query.max_rating
+    )
+
+#===================================================
+# Seleção
+#===================================================
+
+@lru_cache(maxsize=CACHE_SIZE)
+def mask(query):
+    """Máscara booleana (somente leitura) das linhas da tabela compartilhada que atendem à consulta."""
+    result = filter_mask(load_data(), **query.filters())
+    result.setflags(write=False)
+    return result
+
+@lru_cache(maxsize=None)
+def factorized(column):
+    """Códigos de cada linha e rótulos ordenados de uma coluna, fatorados uma única vez por processo."""
+    codes, labels = pd.factorize(load_data()[column], sort=True)
+    codes.setflags(write=False)
+    return codes, labels
+
+@lru_cache(maxsize=None)
+def row_nbytes(columns):
+    """Tamanho médio, em bytes, de uma linha com as colunas ``columns`` da tabela compartilhada."""
+    df = load_data()
+    return int(np.ceil(df[list(columns)].memory_usage(deep=True).sum() / max(len(df), 1)))
+
+def rows(query, columns):
+    """Materializa apenas ``columns`` das linhas selecionadas (cópia própria do chamador).
+
+    O tamanho estimado da cópia é cobrado do orçamento de memória da sessão
+    em execução antes de alocá-la, de modo que MemoryBudgetExceeded impede a
+    alocação acima do teto.
+    """
+    selected = mask(query)
+    budget = active_budget()
+    if budget is not None:
+        budget.charge('rows[' + ', '.join(columns) + ']', int(np.count_nonzero(selected)) * row_nbytes(tuple(columns)))
+    return select(load_data(), selected, columns)
+
+#===================================================
+# Agregações
+#===================================================
+
+def _group_sums(query, by, weights=None):
+    """Soma de ``weights`` (ou contagem de linhas) por código de ``by`` sobre a seleção, sem copiar as linhas."""
+    codes, labels = factorized(by)
+    selected = mask(query.exact())
+    weights = selected if weights is None else np.where(selected, weights, 0.0)
+    return np.bincount(codes, weights=weights, minlength=len(labels)), labels
+
+@lru_cache(maxsize=CACHE_SIZE)
+def count_by(query, by):
+    """Quantidade de restaurantes por valor de ``by``: colunas [by, 'count']."""
+    counts, labels = _group_sums(query, by)
+    present = counts > 0
+    return pd.DataFrame({by: labels[present], 'count': counts[present].astype(np.int64)})
+
+@lru_cache(maxsize=None)
+def _pairs(column, by):
+    """Pares distintos (by, column) da tabela: código do par de cada linha e código de ``by`` de cada par."""
+    by_codes, _ = factorized(by)
+    column_codes, column_labels = factorized(column)
+    pairs, pair_codes = np.unique(by_codes.astype(np.int64) * len(column_labels) + column_codes, return_inverse=True)
+    return pair_codes.ravel(), pairs // len(column_labels)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def distinct_by(query, column, by):
+    """Quantidade de valores distintos de ``column`` por valor de ``by``: colunas [by, column]."""
+    sketches = _sketches(query)
+    if sketches is not None and column in load_sketches().distinct:
+        try:
+            return sketches.distinct(column, by=by)
+        except ValueError:
+            pass  # filtro sem suporte nos sketches: usa o caminho exato
+    pair_codes, pair_by = _pairs(column, by)
+    _, labels = factorized(by)
+    present_pairs = np.bincount(pair_codes, weights=mask(query.exact()), minlength=len(pair_by)) > 0
+    distinct = np.bincount(pair_by, weights=present_pairs, minlength=len(labels))
+    present = distinct > 0
+    return pd.DataFrame({by: labels[present], column: distinct[present].astype(np.int64)})
+
+@lru_cache(maxsize=CACHE_SIZE)
+def mean_by(query, metric, by):
+    """Média de ``metric`` por valor de ``by``: colunas [by, metric]."""
+    sketches = _sketches(query)
+    if sketches is not None and metric in load_sketches().sums:
+        try:
+            return sketches.mean(metric, by=by)
+        except ValueError:
+            pass  # filtro sem suporte nos sketches: usa o caminho exato
+    counts, labels = _group_sums(query, by)
+    sums, _ = _group_sums(query, by, load_data()[metric].to_numpy(np.float64))
+    present = counts > 0
+    return pd.DataFrame({by: labels[present], metric: sums[present] / counts[present]})
+
+@lru_cache(maxsize=CACHE_SIZE)
+def top_by_cuisine(query, n=1):
+    """Os ``n`` melhores restaurantes (nota, depois votos) por culinária: colunas [Cuisines, Restaurant Name, Aggregate rating, Votes]."""
+    return load_leaderboard().top(n, **query.filters())
+
+@lru_cache(maxsize=1)
+def _crosstab_keys():
+    """Chave composta (serviços, faixa de nota, faixa de preço) de cada linha da tabela, calculada uma única vez."""
+    df = load_data()
+    ratings = df['Aggregate rating'].to_numpy(np.float64)
+    buckets = np.where(ratings > 0, np.searchsorted(RATING_BUCKETS, ratings, side='right'), 0)
+    prices = np.clip(df['Price range'].to_numpy(np.int64) - 1, 0, PRICE_RANGES - 1)
+    keys = np.ravel_multi_index((df['Flags'].to_numpy(np.int64), buckets, prices), CROSSTAB_SHAPE)
+    keys.setflags(write=False)
+    return keys
+
+@lru_cache(maxsize=CACHE_SIZE)
+def flag_crosstab(query):
+    """Crosstab combinação de serviços × faixa de nota × faixa de preço, com médias de nota e de preço.
+
+    Calculado em uma única passada vetorizada (bincount, ponderado pela
+    máscara, sobre a chave composta pré-calculada). Colunas: [Flags,
+    Rating bucket, Price range, count, Aggregate rating, Average Cost for
+    two]; apenas células não vazias.
+    """
+    df = load_data()
+    keys = _crosstab_keys()
+    selected = mask(query.exact())
+    size = int(np.prod(CROSSTAB_SHAPE))
+    counts = np.bincount(keys, weights=selected, minlength=size).astype(np.int64)
+    rating_sums = np.bincount(keys, weights=np.where(selected, df['Aggregate rating'].to_numpy(np.float64), 0.0), minlength=size)
+    cost_sums = np.bincount(keys, weights=np.where(selected, df['Average Cost for two'].to_numpy(np.float64), 0.0), minlength=size)
+
+    cells = np.flatnonzero(counts)
+    flags, buckets, prices = np.unravel_index(cells, CROSSTAB_SHAPE)
+    return pd.DataFrame({
+        'Flags': flags.astype(np.uint8),
+        'Rating bucket': np.array(RATING_BUCKET_LABELS, dtype=object)[buckets],
+        'Price range': prices + 1,
+        'count': counts[cells],
+        'Aggregate rating': rating_sums[cells] / counts[cells],
+        'Average Cost for two': cost_sums[cells] / counts[cells],
+    })
+
+@lru_cache(maxsize=CACHE_SIZE)
+def flag_counts(query, column):
+    """Quantidade de restaurantes por valor (0/1) de uma das FLAG_COLUMNS, do mais ao menos frequente: colunas [column, 'count']."""
+    crosstab = flag_crosstab(query)
+    counts = crosstab.groupby(has_flag(crosstab['Flags'], column))['count'].sum()
+    counts = counts.rename_axis(column).reset_index().sort_values(by='count', ascending=False, kind='stable')
+    return counts.reset_index(drop=True)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def flag_combinations(query):
+    """Quantidade e médias de nota e preço por combinação de serviços: colunas [Flags, count, Aggregate rating, Average Cost for two]."""
+    crosstab = flag_crosstab(query)
+    totals = crosstab.assign(
+        rating_sum=crosstab['Aggregate rating'] * crosstab['count'],
+        cost_sum=crosstab['Average Cost for two'] * crosstab['count'],
+    ).groupby('Flags')[['count', 'rating_sum', 'cost_sum']].sum()
+    return pd.DataFrame({
+        'Flags': totals.index.to_numpy(),
+        'count': totals['count'].to_numpy(),
+        'Aggregate rating': (totals['rating_sum'] / totals['count']).to_numpy(),
+        'Average Cost for two': (totals['cost_sum'] / totals['count']).to_numpy(),
+    })
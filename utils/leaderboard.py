@@ -0,0 +1,102 @@
+"""Ranking pré-calculado dos melhores restaurantes por tipo de culinária.
+
+A tabela é ordenada uma única vez por (nota, votos) em ordem decrescente e
+particionada em células (país, cidade, tipo de culinária), de modo que cada
+célula guarda uma lista já ordenada. Uma consulta "top N por culinária"
+seleciona as células que atendem aos filtros, recorta de cada uma no máximo
+N restaurantes (os filtros de nota viram busca binária na lista ordenada) e
+mescla as listas pequenas de cada culinária, sem percorrer a tabela.
+
+Empates de nota são desempatados pela quantidade de votos e, persistindo,
+pela ordem original da tabela.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import filter_mask, load_data
+
+#===================================================
+# Constantes
+#===================================================
+
+CELL_COLUMNS = ['Country Code', 'City', 'Cuisines']
+RATING_COLUMN = 'Aggregate rating'
+VOTES_COLUMN = 'Votes'
+LABEL_COLUMN = 'Restaurant Name'
+
+#===================================================
+# Ranking
+#===================================================
+
+class Leaderboard:
+    """Listas de restaurantes pré-ordenadas por (nota, votos) em cada célula (país, cidade, culinária)."""
+
+    def __init__(self, df):
+        ratings = df[RATING_COLUMN].to_numpy(np.float64)
+        votes = df[VOTES_COLUMN].to_numpy(np.int64)
+        cell_ids = df.groupby(CELL_COLUMNS, sort=False).ngroup().to_numpy()
+
+        # Posição de cada linha na ordem global por (-nota, -votos, linha)
+        ranking = np.lexsort((np.arange(len(df)), -votes, -ratings))
+        rank = np.empty(len(df), dtype=np.int64)
+        rank[ranking] = np.arange(len(df))
+
+        # Listas por célula: mesma ordem global, agrupada por célula
+        order = ranking[np.argsort(cell_ids[ranking], kind='stable')]
+        self.cells = df[CELL_COLUMNS].drop_duplicates().reset_index(drop=True)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(cell_ids, minlength=len(self.cells)))])
+        self.rows = order
+        self.rank = rank[order]
+
+        # Chave composta (célula, -nota) crescente em toda a tabela: uma única busca binária
+        # encontra o recorte de nota de todas as células de uma vez
+        self.span = float(ratings.max() - min(ratings.min(), 0)) + 1 if len(df) else 1.0
+        self.top_rating = float(ratings.max()) if len(df) else 0.0
+        self.keys = cell_ids[order] * self.span + (self.top_rating - ratings[order])
+
+        self.cuisine_codes, self.cuisines = pd.factorize(self.cells['Cuisines'], sort=True)
+        self.labels = df[LABEL_COLUMN].to_numpy()
+        self.ratings = ratings
+        self.votes = votes
+
+    def _bound(self, cells, rating, side):
+        """Posição, em cada célula, do primeiro restaurante com nota abaixo de ``rating`` (side='left': até ``rating``)."""
+        return np.searchsorted(self.keys, cells * self.span + (self.top_rating - rating), side=side)
+
+    def top(self, n=1, countries=None, cuisines=None, cities=None, max_rating=None, rating_below=None, rating_above=None):
+        """Retorna os ``n`` melhores restaurantes de cada culinária que atendem aos filtros."""
+        cells = np.flatnonzero(filter_mask(self.cells, countries=countries, cuisines=cuisines, cities=cities))
+
+        # Recorte de cada lista pré-ordenada: filtros de nota por busca binária e no máximo n por célula
+        lo, hi = self.offsets[cells], self.offsets[cells + 1]
+        if max_rating is not None:
+            lo = np.maximum(lo, self._bound(cells, max_rating, 'left'))
+        if rating_below is not None:
+            lo = np.maximum(lo, self._bound(cells, rating_below, 'right'))
+        if rating_above is not None:
+            hi = np.minimum(hi, self._bound(cells, rating_above, 'left'))
+        counts = np.clip(np.minimum(hi, lo + n) - lo, 0, None)
+
+        # Mescla das listas de cada culinária pela posição na ordem global e corte nos n primeiros
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        candidates = starts + np.arange(counts.sum())
+        codes = np.repeat(self.cuisine_codes[cells], counts)
+        merged = np.lexsort((self.rank[candidates], codes))
+        candidates, codes = candidates[merged], codes[merged]
+        group_start = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        position = np.arange(len(codes)) - np.repeat(group_start, np.diff(np.r_[group_start, len(codes)]))
+        keep = position < n
+
+        rows = self.rows[candidates[keep]]
+        return pd.DataFrame({
+            'Cuisines': self.cuisines[codes[keep]],
+            LABEL_COLUMN: self.labels[rows],
+            RATING_COLUMN: self.ratings[rows],
+            VOTES_COLUMN: self.votes[rows],
+        })
+
+@st.cache_resource
+def load_leaderboard():
+    """Função para construir, uma única vez por processo, o ranking da tabela compartilhada."""
+    return Leaderboard(load_data())
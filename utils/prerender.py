@@ -0,0 +1,193 @@
+"""Pré-renderização offline das visões padrão do dashboard.
+
+Renderiza uma matriz de seleções (país/culinária/cidade) das páginas País e
+Tipos de Culinária para HTML e JSON estáticos, em paralelo, usando um pool
+de processos com todos os núcleos. A página ao vivo consulta
+``load_prerendered`` e, quando a seleção coincide com um artefato, exibe-o
+diretamente em vez de recalcular. Artefatos gerados a partir de outra versão
+do arquivo de dados (impressão digital no manifesto) são ignorados. Cada
+seleção é gravada em um diretório temporário e trocada de uma vez, de modo
+que a pré-renderização pode rodar com a aplicação no ar.
+
+Uso::
+
+    python -m utils.prerender                       # matriz padrão: cada país com os filtros padrão
+    python -m utils.prerender --matrix matriz.json  # matriz configurável
+    python -m utils.prerender --workers 4
+
+O arquivo da matriz é uma lista JSON de seleções, por exemplo::
+
+    [{"page": "Pais", "countries": ["Brazil"], "cuisines": ["Home-made"], "cities": ["São Paulo"]},
+     {"page": "Tipos_de_Culinaria", "countries": ["India"], "cuisines": ["North Indian"]}]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import plotly.io as pio
+import streamlit as st
+
+from utils.data import COUNTRIES, data_fingerprint, load_data
+from utils.engine import Query
+from utils.views import best_restaurant_by_cuisine, country_figures, cuisine_figures, map_frame, plot_detailed_map
+
+logger = logging.getLogger(__name__)
+
+#===================================================
+# Constantes
+#===================================================
+
+PRERENDER_DIR_ENV = 'FOME_ZERO_PRERENDER_DIR'
+DEFAULT_PRERENDER_DIR = 'prerendered'
+
+PAGES = ['Pais', 'Tipos_de_Culinaria']
+
+# Versão dos artefatos: incrementada quando o conjunto de gráficos das páginas muda, para
+# que artefatos antigos sejam ignorados (e a página recalcule) até a próxima pré-renderização
+PRERENDER_VERSION = 2
+
+# Filtros padrão das barras laterais de cada página
+DEFAULT_CUISINES = ['Home-made']
+DEFAULT_CITIES = ['São Paulo']
+
+#===================================================
+# Chaves e diretórios
+#===================================================
+
+def prerender_dir():
+    """Função para retornar o diretório dos artefatos pré-renderizados."""
+    return os.environ.get(PRERENDER_DIR_ENV, DEFAULT_PRERENDER_DIR)
+
+def selection_key(page, query):
+    """Função para calcular a chave estável de uma seleção (página + filtros efetivos da consulta)."""
+    payload = json.dumps({'page': page, **query.exact().to_dict()}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def default_matrix():
+    """Função para montar a matriz padrão: cada país com os filtros padrão das páginas."""
+    max_rating = float(load_data()['Aggregate rating'].max())
+    matrix = []
+    for country in COUNTRIES.values():
+        matrix.append({'page': 'Pais', 'countries': [country], 'cuisines': DEFAULT_CUISINES, 'cities': DEFAULT_CITIES})
+        matrix.append({'page': 'Tipos_de_Culinaria', 'countries': [country], 'cuisines': DEFAULT_CUISINES, 'max_rating': max_rating})
+    return matrix
+
+#===================================================
+# Renderização
+#===================================================
+
+def render_selection(selection, output_dir=None):
+    """Função para renderizar uma seleção e gravar seus artefatos em ``<dir>/<chave>/``."""
+    output_dir = output_dir or prerender_dir()
+    page = selection['page']
+    if page not in PAGES:
+        raise ValueError(f"Página sem pré-renderização: {page}")
+
+    query = Query.from_sidebar(
+        selection.get('countries'), selection.get('cuisines', []),
+        selection.get('cities'), selection.get('max_rating')
+    )
+    key = selection_key(page, query)
+    os.makedirs(output_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f'.{key}-', dir=output_dir)
+    os.chmod(staging, 0o755)  # mkdtemp cria o diretório legível só pelo dono
+    try:
+        _write_artifacts(page, query, staging)
+        _swap_directory(staging, os.path.join(output_dir, key))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return key
+
+def _write_artifacts(page, query, target):
+    """Grava os gráficos, o mapa ou a tabela e, por último, o manifesto de uma seleção em ``target``."""
+    if page == 'Pais':
+        figures = country_figures(query)
+        plot_detailed_map(map_frame(query)).save(os.path.join(target, 'mapa.html'))
+    else:
+        figures = cuisine_figures(query)
+        best_restaurant_by_cuisine(query).to_json(os.path.join(target, 'melhores_restaurantes.json'), orient='split', index=False)
+
+    for name, fig in figures.items():
+        pio.write_json(fig, os.path.join(target, f'{name}.json'), validate=False)
+        pio.write_html(fig, os.path.join(target, f'{name}.html'), include_plotlyjs='cdn')
+
+    with open(os.path.join(target, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': PRERENDER_VERSION, 'data': data_fingerprint(), 'page': page, 'query': query.to_dict(), 'charts': list(figures)}, f, ensure_ascii=False, indent=2)
+
+def _swap_directory(staging, target):
+    """Troca ``target`` pelo diretório completo ``staging``: leitores veem o conjunto antigo, o novo ou nenhum, nunca arquivos pela metade."""
+    stale = f'{staging}.old'
+    try:
+        os.replace(target, stale)
+    except FileNotFoundError:
+        stale = None  # primeira renderização da seleção
+    os.replace(staging, target)
+    if stale is not None:
+        shutil.rmtree(stale, ignore_errors=True)
+
+def prerender(matrix, output_dir=None, workers=None):
+    """Função para renderizar a matriz de seleções em paralelo com um pool de processos."""
+    output_dir = output_dir or prerender_dir()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(render_selection, matrix, [output_dir] * len(matrix)))
+
+#===================================================
+# Leitura pela aplicação ao vivo
+#===================================================
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _read_artifacts(manifest_path, mtime_ns, fingerprint):
+    """Lê e valida os artefatos de um manifesto (em cache até o manifesto ou os dados mudarem)."""
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != PRERENDER_VERSION or manifest.get('data') != fingerprint:
+        return None
+
+    target = os.path.dirname(manifest_path)
+    artifacts = {'figures': {name: pio.read_json(os.path.join(target, f'{name}.json')) for name in manifest['charts']}}
+    if manifest['page'] == 'Pais':
+        with open(os.path.join(target, 'mapa.html'), encoding='utf-8') as f:
+            artifacts['map_html'] = f.read()
+    else:
+        artifacts['best_restaurants'] = pd.read_json(os.path.join(target, 'melhores_restaurantes.json'), orient='split')
+    return artifacts
+
+def load_prerendered(page, query, output_dir=None):
+    """Função para carregar os artefatos de uma consulta, ou None se ela não foi pré-renderizada com os dados atuais."""
+    manifest_path = os.path.join(output_dir or prerender_dir(), selection_key(page, query), 'manifest.json')
+    try:
+        mtime_ns = os.stat(manifest_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    try:
+        return _read_artifacts(manifest_path, mtime_ns, data_fingerprint())
+    except (OSError, ValueError, KeyError) as e:
+        # Artefato trocado ou corrompido durante a leitura: a página recalcula ao vivo
+        logger.warning("artefato pré-renderizado ilegível em %s: %s", manifest_path, e)
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Pré-renderiza as visões padrão do Fome Zero em HTML e JSON.')
+    parser.add_argument('--matrix', help='Arquivo JSON com a lista de seleções (padrão: cada país com os filtros padrão).')
+    parser.add_argument('--output', default=None, help=f'Diretório de saída (padrão: ${PRERENDER_DIR_ENV} ou {DEFAULT_PRERENDER_DIR}).')
+    parser.add_argument('--workers', type=int, default=None, help='Número de processos (padrão: todos os núcleos).')
+    args = parser.parse_args()
+
+    if args.matrix:
+        with open(args.matrix, encoding='utf-8') as f:
+            matrix = json.load(f)
+    else:
+        matrix = default_matrix()
+
+    keys = prerender(matrix, output_dir=args.output, workers=args.workers)
+    print(f"{len(keys)} seleções pré-renderizadas em {args.output or prerender_dir()}")
+
+if __name__ == '__main__':
+    main()
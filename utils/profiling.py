@@ -0,0 +1,191 @@
+"""Perfilamento opcional dos reruns das páginas.
+
+Desligado por padrão. É ativado para todas as sessões com a variável de
+ambiente ``FOME_ZERO_PROFILE=1`` ou para uma sessão específica com o
+parâmetro ``?profile=1`` na URL. Cada rerun da página roda sob o cProfile
+(``with profile_run(página)``) e, quando demora mais que o limite
+(``FOME_ZERO_PROFILE_THRESHOLD_MS``, padrão 500 ms), o perfil é gravado no
+formato padrão do pstats (``<dir>/<página>-<data>.prof``) junto com um JSON
+de mesmo nome com os filtros da seleção que o gerou e o desfecho do rerun
+(inclusive reruns interrompidos por ``st.stop()`` ou por exceções). Apenas
+os ``FOME_ZERO_PROFILE_MAX_FILES`` perfis mais recentes (padrão 50) são
+mantidos no diretório.
+
+Apenas um rerun é perfilado por vez no processo: a partir do Python 3.12 o
+cProfile usa o ``sys.monitoring`` global do interpretador, que não aceita
+dois perfis ativos (``ValueError``) e registra as chamadas de todas as
+threads. Um rerun que começa enquanto outro está sendo perfilado roda sem
+perfil (e isso é registrado no log); no 3.12+ o perfil gravado pode incluir
+chamadas de outras sessões que rodaram ao mesmo tempo. Para analisar::
+
+    python -m pstats profiles/Pais-20240101-120000-000000.prof
+    snakeviz profiles/Pais-20240101-120000-000000.prof
+"""
+import cProfile
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+#===================================================
+# Constantes
+#===================================================
+
+PROFILE_ENV = 'FOME_ZERO_PROFILE'
+PROFILE_THRESHOLD_ENV = 'FOME_ZERO_PROFILE_THRESHOLD_MS'
+PROFILE_DIR_ENV = 'FOME_ZERO_PROFILE_DIR'
+PROFILE_MAX_FILES_ENV = 'FOME_ZERO_PROFILE_MAX_FILES'
+PROFILE_PARAM = 'profile'
+
+DEFAULT_PROFILE_THRESHOLD_MS = 500
+DEFAULT_PROFILE_DIR = 'profiles'
+DEFAULT_PROFILE_MAX_FILES = 50
+
+ENABLED_VALUES = {'1', 'true', 'yes', 'on'}
+
+# Um único perfil ativo por processo (o cProfile do Python 3.12+ é global ao interpretador)
+_PROFILE_LOCK = threading.Lock()
+
+#===================================================
+# Perfilador por sessão
+#===================================================
+
+def profiling_enabled():
+    """Função para verificar se o perfilamento foi pedido pelo ambiente ou pela URL da sessão."""
+    if os.environ.get(PROFILE_ENV, '').lower() in ENABLED_VALUES:
+        return True
+    return str(st.query_params.get(PROFILE_PARAM, '')).lower() in ENABLED_VALUES
+
+class RunProfiler:
+    """Perfila um rerun com o cProfile e grava o perfil quando ele passa do limite de tempo."""
+
+    def __init__(self, threshold_ms=None, output_dir=None, max_files=None):
+        if threshold_ms is None:
+            threshold_ms = float(os.environ.get(PROFILE_THRESHOLD_ENV, DEFAULT_PROFILE_THRESHOLD_MS))
+        if max_files is None:
+            max_files = int(os.environ.get(PROFILE_MAX_FILES_ENV, DEFAULT_PROFILE_MAX_FILES))
+        self.threshold_ms = threshold_ms
+        self.output_dir = output_dir or os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+        self.max_files = max_files
+        self.page = None
+        self.query = None
+        self.query_params = {}
+        self.profile = None
+        self.started = None
+
+    def begin_run(self, page):
+        """Inicia o perfilamento de um novo rerun; retorna False (sem perfil) se outro rerun já está sendo perfilado."""
+        self._release()  # rerun anterior interrompido sem finish()
+        self.page = page
+        self.query = None
+        self.query_params = st.query_params.to_dict()
+        if not _PROFILE_LOCK.acquire(blocking=False):
+            logger.info("perfilamento já ativo em outro rerun: rerun de %s não perfilado", page)
+            return False
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Outra ferramenta de perfilamento ativa no interpretador (Python 3.12+)
+            _PROFILE_LOCK.release()
+            logger.info("rerun de %s não perfilado: %s", page, e)
+            return False
+        self.profile = profile
+        self.started = time.perf_counter()
+        return True
+
+    def _release(self):
+        """Desliga o perfil ativo desta sessão, se houver, e libera o perfilamento para as demais."""
+        if self.profile is None:
+            return None
+        profile, self.profile = self.profile, None
+        profile.disable()
+        _PROFILE_LOCK.release()
+        return profile
+
+    def set_query(self, query):
+        """Registra a consulta do rerun, gravada junto com o perfil."""
+        self.query = query
+
+    def finish(self, outcome='ok'):
+        """Encerra o rerun e grava o perfil se ele passou do limite; retorna o caminho gravado ou None."""
+        profile = self._release()
+        if profile is None:
+            return None
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(self.output_dir, f"{self.page}-{datetime.now():%Y%m%d-%H%M%S-%f}")
+        # Estado capturado durante o rerun: após st.stop() a sessão não aceita mais chamadas do Streamlit
+        state = {
+            'page': self.page,
+            'elapsed_ms': round(elapsed_ms, 1),
+            'threshold_ms': self.threshold_ms,
+            'outcome': outcome,
+            'query': self.query.to_dict() if self.query is not None else None,
+            'query_params': self.query_params,
+        }
+        profile.dump_stats(f'{stem}.prof')
+        with open(f'{stem}.json', 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+
+        logger.info("rerun lento de %s (%.0f ms, %s): perfil gravado em %s.prof", self.page, elapsed_ms, outcome, stem)
+        self.prune()
+        return f'{stem}.prof'
+
+    def prune(self):
+        """Remove os perfis mais antigos (e seus JSON) além de ``max_files``."""
+        profiles = sorted(glob.glob(os.path.join(self.output_dir, '*.prof')), key=os.path.getmtime)
+        for path in profiles[:max(len(profiles) - self.max_files, 0)]:
+            for stale in (path, path[:-len('.prof')] + '.json'):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass  # já removido por outra sessão
+
+class _DisabledProfiler:
+    """Perfilador nulo usado quando o perfilamento não foi pedido."""
+
+    def set_query(self, query):
+        pass
+
+    def finish(self, outcome='ok'):
+        return None
+
+def session_profiler(page):
+    """Função para iniciar o perfilamento do rerun da sessão atual, se pedido (senão, não faz nada)."""
+    if not profiling_enabled():
+        return _DisabledProfiler()
+    if 'profiler' not in st.session_state:
+        st.session_state['profiler'] = RunProfiler()
+    profiler = st.session_state['profiler']
+    profiler.begin_run(page)
+    return profiler
+
+@contextmanager
+def profile_run(page):
+    """Perfila o corpo do ``with`` como um rerun da página, se pedido (``?profile=1`` ou ``FOME_ZERO_PROFILE=1``).
+
+    As páginas envolvem todo o script no ``with``, de modo que o perfil é
+    gravado mesmo quando o rerun termina em st.stop() (por exemplo, ao
+    estourar o orçamento de memória) ou em uma exceção.
+    """
+    profiler = session_profiler(page)
+    outcome = 'ok'
+    try:
+        yield profiler
+    except BaseException as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        profiler.finish(outcome)
@@ -0,0 +1,137 @@
+"""Índice de busca para typeahead sobre cidades, culinárias e restaurantes.
+
+O índice é construído uma única vez por processo e combina duas estruturas:
+
+- lista ordenada de palavras (equivalente a uma trie de prefixos, consultada
+  com busca binária) para casar o prefixo que o usuário está digitando;
+- índice invertido de trigramas para tolerar erros de digitação, com
+  relevância dada pela similaridade de Jaccard entre os trigramas.
+"""
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import load_data
+
+#===================================================
+# Constantes
+#===================================================
+
+SEARCH_FIELDS = ['City', 'Cuisines', 'Restaurant Name', 'Address']
+
+# Campos que identificam um restaurante: cada linha é indexada (redes como Domino's ou
+# Burger King têm uma filial por linha); nos demais cada valor distinto é indexado uma vez
+RESTAURANT_FIELDS = ['Restaurant Name', 'Address']
+
+PREFIX_BOOST = 1.0
+EXACT_PREFIX_BOOST = 0.5
+
+#===================================================
+# Normalização
+#===================================================
+
+def normalize(text):
+    """Função para remover acentos, caixa e espaços repetidos de um texto."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode()
+    return ' '.join(text.lower().split())
+
+def trigrams(text):
+    """Função para retornar o conjunto de trigramas de um texto normalizado."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+#===================================================
+# Índice
+#===================================================
+
+class SearchIndex:
+    """Índice de prefixos e de trigramas sobre os campos de busca da tabela."""
+
+    def __init__(self, df, fields=SEARCH_FIELDS):
+        fields_col, values, rows = [], [], []
+        for field in fields:
+            column = df[field].astype(str)
+            if field not in RESTAURANT_FIELDS:
+                # Valor distinto indexado uma vez, apontando para a primeira linha em que aparece
+                column = column.drop_duplicates()
+            fields_col.extend([field] * len(column))
+            values.extend(column.tolist())
+            rows.extend(column.index.tolist())
+
+        self.fields = np.array(fields_col, dtype=object)
+        self.values = np.array(values, dtype=object)
+        self.rows = np.array(rows, dtype=np.int64)
+        normalized = [normalize(value) for value in values]
+
+        # Palavras e textos completos ordenados para busca de prefixo
+        words = sorted((word, doc) for doc, text in enumerate(normalized) for word in set(text.split()))
+        self.words = [word for word, _ in words]
+        self.word_docs = np.array([doc for _, doc in words], dtype=np.int64)
+        texts = sorted((text, doc) for doc, text in enumerate(normalized))
+        self.texts = [text for text, _ in texts]
+        self.text_docs = np.array([doc for _, doc in texts], dtype=np.int64)
+
+        # Índice invertido de trigramas
+        postings = defaultdict(list)
+        gram_counts = np.zeros(len(normalized), dtype=np.int64)
+        for doc, text in enumerate(normalized):
+            grams = trigrams(text)
+            gram_counts[doc] = len(grams)
+            for gram in grams:
+                postings[gram].append(doc)
+        self.postings = {gram: np.array(docs, dtype=np.int64) for gram, docs in postings.items()}
+        self.gram_counts = gram_counts
+
+    @staticmethod
+    def _prefix_range(keys, docs, prefix):
+        """Retorna os documentos cujas chaves ordenadas começam por ``prefix``."""
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + '\uffff', lo=start)
+        return docs[start:end]
+
+    def search(self, query, fields=None, limit=10):
+        """Busca aproximada com resultados ordenados por relevância.
+
+        A relevância soma a similaridade de trigramas ao bônus de prefixo da
+        última palavra digitada (typeahead) e ao bônus de prefixo do texto inteiro.
+        """
+        text = normalize(query)
+        if not text:
+            return pd.DataFrame(columns=['Field', 'Value', 'Score', 'Row'])
+
+        scores = np.zeros(len(self.values), dtype=np.float64)
+        grams = trigrams(text)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if hits:
+            shared = np.bincount(np.concatenate(hits), minlength=len(self.values))
+            scores += shared / (len(grams) + self.gram_counts - shared)
+
+        scores[self._prefix_range(self.words, self.word_docs, text.split()[-1])] += PREFIX_BOOST
+        scores[self._prefix_range(self.texts, self.text_docs, text)] += EXACT_PREFIX_BOOST
+
+        if fields is not None:
+            scores[~np.isin(self.fields, fields)] = 0
+
+        # Empates (ex.: filiais de uma rede) ficam na ordem da tabela
+        candidates = np.flatnonzero(scores > 0)
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')][:limit]
+        return pd.DataFrame({
+            'Field': self.fields[candidates],
+            'Value': self.values[candidates],
+            'Score': scores[candidates].round(3),
+            'Row': self.rows[candidates],
+        })
+
+@st.cache_resource
+def load_search_index():
+    """Função para construir, uma única vez por processo, o índice de busca da tabela compartilhada."""
+    return SearchIndex(load_data())
+
+@st.cache_resource
+def load_options(column):
+    """Função para retornar, em cache, os valores distintos de uma coluna para os multiselects."""
+    return load_data()[column].unique().tolist()
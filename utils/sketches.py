@@ -0,0 +1,166 @@
+"""Agregações aproximadas para seleções grandes.
+
+Os sketches são pré-calculados uma única vez por célula (combinação de país,
+cidade e tipo de culinária) e mesclados no momento da consulta, de modo que o
+custo de uma consulta depende do número de células selecionadas e não do
+número de linhas da tabela.
+
+As médias são sketches de soma e contagem, que se mesclam sem perda; não há
+sketch de quantis porque nenhum gráfico usa quantis. Com a célula atual a
+contagem exata de cidades por país também custaria O(células), já que a
+cidade faz parte da célula; o HyperLogLog é mantido para que a contagem de
+distintos não dependa disso e continue valendo se as células forem
+engrossadas (por exemplo, país × culinária) para tabelas com milhões de
+linhas, e para colunas que não são dimensões da célula.
+
+Limites de erro:
+
+- Contagem de valores distintos (HyperLogLog com precisão ``p``): erro
+  relativo padrão de ``1.04 / sqrt(2 ** p)``, ou seja, cerca de 1,6% com o
+  padrão ``p = 12``. Para contagens pequenas é usada a correção de
+  contagem linear, que é praticamente exata.
+- Médias sem filtro de nota: exatas, pois soma e contagem são mescláveis.
+- Média de avaliação com filtro de nota: exata. As notas têm poucas dezenas
+  de valores distintos, então cada célula guarda um histograma por valor de
+  nota e o filtro é aplicado sobre o valor real (e não sobre um bin).
+  Outras métricas com filtro de nota não são suportadas no modo aproximado
+  e a consulta volta ao caminho exato.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import filter_mask, load_data
+
+#===================================================
+# Constantes
+#===================================================
+
+HLL_PRECISION = 12
+
+CELL_COLUMNS = ['Country Code', 'Country', 'City', 'Cuisines']
+DISTINCT_COLUMNS = ['City']
+METRICS = ['Aggregate rating', 'Average Cost for two']
+RATING_COLUMN = 'Aggregate rating'
+
+#===================================================
+# HyperLogLog
+#===================================================
+
+def hll_relative_error(precision=HLL_PRECISION):
+    """Função para retornar o erro relativo padrão do HyperLogLog."""
+    return 1.04 / math.sqrt(2 ** precision)
+
+def hll_encode(values, precision=HLL_PRECISION):
+    """Função para calcular o registrador e o rank HyperLogLog de cada valor."""
+    hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+    registers = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    remainder = hashes & np.uint64((1 << (64 - precision)) - 1)
+    # frexp devolve o número de bits significativos (0 quando o resto é zero)
+    _, bit_length = np.frexp(remainder.astype(np.float64))
+    ranks = (64 - precision - bit_length + 1).astype(np.uint8)
+    return registers, ranks
+
+def hll_estimate(registers):
+    """Função para estimar a cardinalidade a partir de registradores (uma linha por grupo)."""
+    registers = np.atleast_2d(registers)
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=1)
+    zeros = np.count_nonzero(registers == 0, axis=1)
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+#===================================================
+# Sketches pré-calculados
+#===================================================
+
+class SketchStore:
+    """Sketches mescláveis por célula (país, cidade, tipo de culinária)."""
+
+    def __init__(self, df, precision=HLL_PRECISION, distinct_columns=DISTINCT_COLUMNS, metrics=METRICS):
+        self.precision = precision
+        cell_ids = df.groupby(CELL_COLUMNS, sort=False).ngroup().to_numpy()
+        self.cells = df[CELL_COLUMNS].drop_duplicates().reset_index(drop=True)
+
+        # HyperLogLog esparso: maior rank por (célula, registrador)
+        self.distinct = {}
+        for column in distinct_columns:
+            registers, ranks = hll_encode(df[column].to_numpy(), precision)
+            sparse = pd.DataFrame({'cell': cell_ids, 'register': registers, 'rank': ranks})
+            sparse = sparse.groupby(['cell', 'register'], sort=True)['rank'].max().reset_index()
+            self.distinct[column] = (
+                sparse['cell'].to_numpy(), sparse['register'].to_numpy(), sparse['rank'].to_numpy(np.uint8)
+            )
+
+        # Soma/contagem exatas por célula
+        n_cells = len(self.cells)
+        self.counts = np.bincount(cell_ids, minlength=n_cells)
+        self.sums = {}
+        for metric in metrics:
+            self.sums[metric] = np.bincount(cell_ids, weights=df[metric].to_numpy(np.float64), minlength=n_cells)
+
+        # Histograma exato por valor de nota (poucas dezenas de valores distintos)
+        self.rating_values, rating_index = np.unique(df[RATING_COLUMN].to_numpy(np.float64), return_inverse=True)
+        self.rating_histogram = np.zeros((n_cells, len(self.rating_values)), dtype=np.int32)
+        np.add.at(self.rating_histogram, (cell_ids, rating_index), 1)
+        self.max_rating = float(self.rating_values[-1]) if len(df) else 0.0
+
+    def query(self, countries=None, cuisines=None, cities=None, max_rating=None):
+        """Retorna uma consulta aproximada sobre as células que atendem aos filtros."""
+        mask = filter_mask(self.cells, countries=countries, cuisines=cuisines, cities=cities)
+        if max_rating is not None and max_rating >= self.max_rating:
+            max_rating = None
+        return SketchQuery(self, mask, max_rating)
+
+class SketchQuery:
+    """Mescla os sketches das células selecionadas e responde agregações por dimensão."""
+
+    def __init__(self, store, mask, max_rating=None):
+        self.store = store
+        self.mask = mask
+        self.max_rating = max_rating
+
+    def _groups(self, by):
+        if by not in CELL_COLUMNS:
+            raise ValueError(f"Os sketches só agrupam pelas dimensões da célula {CELL_COLUMNS}, não por '{by}'.")
+        codes, labels = pd.factorize(self.store.cells[by])
+        return codes, labels
+
+    def distinct(self, column, by):
+        """Estima a quantidade de valores distintos de ``column`` por valor de ``by``."""
+        if self.max_rating is not None:
+            raise ValueError("O filtro de nota não é suportado na contagem aproximada de distintos.")
+        cell, register, rank = self.store.distinct[column]
+        codes, labels = self._groups(by)
+        selected = self.mask[cell]
+        registers = np.zeros((len(labels), 2 ** self.store.precision), dtype=np.uint8)
+        np.maximum.at(registers, (codes[cell[selected]], register[selected]), rank[selected])
+        present = np.bincount(codes[self.mask], minlength=len(labels)) > 0
+        estimate = np.rint(hll_estimate(registers)).astype(np.int64)
+        return pd.DataFrame({by: labels[present], column: estimate[present]})
+
+    def mean(self, metric, by):
+        """Calcula a média de ``metric`` por valor de ``by``."""
+        codes, labels = self._groups(by)
+        selected = codes[self.mask]
+        if self.max_rating is None:
+            counts = np.bincount(selected, weights=self.store.counts[self.mask], minlength=len(labels))
+            sums = np.bincount(selected, weights=self.store.sums[metric][self.mask], minlength=len(labels))
+        else:
+            if metric != RATING_COLUMN:
+                raise ValueError(f"O filtro de nota só é suportado para '{RATING_COLUMN}' no modo aproximado.")
+            # Filtro aplicado sobre o valor real de cada nota
+            keep = self.store.rating_values <= self.max_rating
+            histogram = self.store.rating_histogram[self.mask][:, keep]
+            counts = np.bincount(selected, weights=histogram.sum(axis=1), minlength=len(labels))
+            sums = np.bincount(selected, weights=histogram @ self.store.rating_values[keep], minlength=len(labels))
+        present = counts > 0
+        return pd.DataFrame({by: labels[present], metric: sums[present] / counts[present]})
+
+@st.cache_resource
+def load_sketches():
+    """Função para construir, uma única vez por processo, os sketches da tabela compartilhada."""
+    return SketchStore(load_data())
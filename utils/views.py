@@ -0,0 +1,259 @@
+"""Visões (gráficos e tabelas) de todas as páginas.
+
+Cada função recebe um ``Query`` do motor de consultas (utils/engine.py) e
+devolve a figura ou tabela pronta, de modo que a página ao vivo e o
+pré-renderizador offline (utils/prerender.py) usem exatamente o mesmo código.
+"""
+from dataclasses import replace
+
+import folium
+import inflection
+import plotly.graph_objs as go
+import streamlit as st
+from folium.plugins import MarkerCluster
+
+from utils import engine
+from utils.charts import MAX_CATEGORIES, create_bar_chart, create_ranking_chart
+from utils.data import FLAG_COLUMNS, has_flag, load_data
+
+#===================================================
+# Constantes
+#===================================================
+
+MAP_COLUMNS = ['Restaurant Name', 'Cuisines', 'Aggregate rating', 'Latitude', 'Longitude']
+
+# Nomes curtos dos serviços nas legendas das combinações
+FLAG_LABELS = {
+    'Has Online delivery': 'Pedido online',
+    'Has Table booking': 'Reserva',
+    'Is delivering now': 'Entregando agora',
+    'Switch to order menu': 'Menu de pedidos',
+}
+
+#===================================================
+# Visão das Cidades
+#===================================================
+
+def top_cities_by_restaurants(query):
+    """Função para criar o gráfico das top 10 cidades com mais restaurantes."""
+    restaurantes_por_cidade = engine.count_by(query, 'City').rename(columns={'count': 'Quantidade de Restaurantes'})
+    restaurantes_por_cidade = restaurantes_por_cidade.sort_values(by='Quantidade de Restaurantes', ascending=False)
+    top_10_cidades = restaurantes_por_cidade.head(10)
+    return create_bar_chart(top_10_cidades, 'City', 'Quantidade de Restaurantes', 'Top 10 cidades com mais restaurantes')
+
+def top_countries_by_cities(query, country_options):
+    """Função para criar o gráfico dos top 10 países com mais cidades selecionadas."""
+    restaurantes_por_pais = engine.count_by(query, 'Country').rename(columns={'count': 'Quantidade de Cidades'})
+    restaurantes_por_pais = restaurantes_por_pais.sort_values(by='Quantidade de Cidades', ascending=False)
+    restaurantes_por_pais = restaurantes_por_pais[restaurantes_por_pais['Country'].isin(country_options)]
+    top_10_paises = restaurantes_por_pais.head(10)
+    return create_bar_chart(top_10_paises, 'Country', 'Quantidade de Cidades', 'Top 10 países com mais Cidades')
+
+def cities_by_rating(query, title, color_continuous_scale, rating_below=None, rating_above=None):
+    """Função para criar o gráfico de restaurantes por cidade abaixo/acima de uma classificação."""
+    query = replace(query, rating_below=rating_below, rating_above=rating_above)
+    cidades = engine.count_by(query, 'City').rename(columns={'count': 'Quantidade'})
+    return create_bar_chart(cidades, 'City', 'Quantidade', title, color='Quantidade', color_continuous_scale=color_continuous_scale)
+
+def city_figures(query, country_options):
+    """Função para montar todos os gráficos da visão das cidades."""
+    return {
+        'top_cidades': top_cities_by_restaurants(query),
+        'top_paises': top_countries_by_cities(query, country_options),
+        'cidades_abaixo_2_5': cities_by_rating(query, 'Cidades com Classificação Abaixo de 2.5', 'blues', rating_below=2.5),
+        'cidades_acima_4': cities_by_rating(query, 'Cidades com Classificação Acima de 4', 'reds', rating_above=4),
+    }
+
+#===================================================
+# Visão dos Países
+#===================================================
+
+def rename_columns(dataframe):
+    title = lambda x: inflection.titleize(x)
+    snakecase = lambda x: inflection.underscore(x)
+    spaces = lambda x: x.replace(" ", "")
+    cols_old = list(dataframe.columns)
+    cols_old = list(map(title, cols_old))
+    cols_old = list(map(spaces, cols_old))
+    cols_new = list(map(snakecase, cols_old))
+    dataframe.columns = cols_new
+    return dataframe
+
+def top_countries_by_restaurants(query):
+    """Função para criar gráfico dos 10 países com o maior número de restaurantes."""
+    restaurantes_por_pais = engine.count_by(query, 'Country').rename(columns={'Country': 'country_name', 'count': 'Número_de_Restaurantes'})
+    top_10_paises = restaurantes_por_pais.sort_values(by='Número_de_Restaurantes', ascending=False).head(10)
+    fig = create_bar_chart(top_10_paises, 'country_name', 'Número_de_Restaurantes', 'Top 10 Países com o Maior Número de Restaurantes', color='Número_de_Restaurantes')
+    fig.update_layout(
+        xaxis_title='País',
+        yaxis_title='Número de Restaurantes'
+    )
+    fig.update_traces(marker_color='green')
+    return fig
+
+def cities_per_country(query):
+    """Função para criar gráfico da quantidade de cidades registradas por país (HyperLogLog no modo aproximado)."""
+    cidades_por_pais = engine.distinct_by(query, 'City', 'Country').rename(columns={'Country': 'country_name', 'City': 'Número_de_Cidades'})
+    fig = create_bar_chart(cidades_por_pais, 'country_name', 'Número_de_Cidades', 'Quantidade de Cidades Registradas por País', color='Número_de_Cidades')
+    fig.update_layout(
+        xaxis_title='País',
+        yaxis_title='Número de Cidades'
+    )
+    fig.update_traces(marker_color='blue')
+    return fig
+
+def avg_rating_per_country(query):
+    """Função para criar gráfico da média de avaliação por país."""
+    media_avaliacao_por_pais = engine.mean_by(query, 'Aggregate rating', 'Country').rename(columns={'Country': 'country_name', 'Aggregate rating': 'aggregate_rating'})
+    fig = create_bar_chart(media_avaliacao_por_pais, 'country_name', 'aggregate_rating', 'Média de Avaliação por País', color='aggregate_rating')
+    fig.update_layout(
+        xaxis_title='País',
+        yaxis_title='Média de Avaliação'
+    )
+    fig.update_traces(marker_color='orange')
+    return fig
+
+def avg_price_per_country(query, price_column='average_cost_for_two'):
+    """Função para criar gráfico da média do preço de um prato para duas pessoas por país."""
+    media_preco_por_pais = engine.mean_by(query, 'Average Cost for two', 'Country').rename(columns={'Country': 'country_name', 'Average Cost for two': price_column})
+    fig = create_bar_chart(media_preco_por_pais, 'country_name', price_column, f'Média do Preço de um Prato para Duas Pessoas ({price_column})', color=price_column)
+    return fig
+
+def map_frame(query):
+    """Função para materializar as linhas do mapa, com as colunas renomeadas."""
+    return rename_columns(engine.rows(query, MAP_COLUMNS))
+
+def plot_detailed_map(df):
+    """Função para criar mapa detalhado com os restaurantes e informações formatadas no popup."""
+    m = folium.Map(location=[0, 0], zoom_start=2, tiles='OpenStreetMap')
+    marker_cluster = MarkerCluster().add_to(m)
+
+    for index, row in df.iterrows():
+        # Cria o conteúdo HTML para o popup
+        popup_content = f"""
+        <div style="font-size: 16px; font-weight: bold;">{row['restaurant_name']}</div>
+        <div style="font-size: 12px;">Tipo Culinária: {row['cuisines']}</div>
+        <div style="font-size: 12px;">Classificação: {row['aggregate_rating']}</div>
+        """
+
+        folium.Marker(
+            location=[row['latitude'], row['longitude']],
+            popup=folium.Popup(popup_content, max_width=300),
+            icon=folium.Icon(color='blue', icon='info-sign')
+        ).add_to(marker_cluster)
+
+    return m
+
+def country_figures(query):
+    """Função para montar todos os gráficos da visão dos países."""
+    return {
+        'top_paises': top_countries_by_restaurants(query),
+        'cidades_por_pais': cities_per_country(query),
+        'media_avaliacao_por_pais': avg_rating_per_country(query),
+        'media_preco_por_pais': avg_price_per_country(query),
+    }
+
+#===================================================
+# Visão dos Restaurantes
+#===================================================
+
+def types_by_classification(query):
+    """Função para criar gráfico de tipos de restaurantes únicos por faixa de classificação."""
+    df_grouped = engine.distinct_by(query, 'Cuisines', 'Aggregate rating').rename(columns={'Cuisines': 'Cuisine Count'})
+    df_grouped = df_grouped.sort_values(by='Aggregate rating')
+
+    # Eixo x numérico: todas as faixas de classificação são mantidas, sem bucket "Outros"
+    return create_bar_chart(df_grouped, 'Aggregate rating', 'Cuisine Count', 'Tipos de Restaurantes Únicos por Classificação', color='Cuisine Count', color_continuous_scale='viridis', max_categories=None)
+
+def avg_rating_restaurant(query, top_asc, max_categories=MAX_CATEGORIES):
+    """Função para criar gráfico de funil para médias de avaliações por restaurante (todos, se ``max_categories`` for None)."""
+    media_rating_por_restaurante = engine.mean_by(query, 'Aggregate rating', 'Restaurant Name')
+    media_rating_por_restaurante = media_rating_por_restaurante.sort_values(by='Aggregate rating', ascending=top_asc)
+
+    # Preparar os dados para o gráfico de funil (top restaurantes + "Outros"; WebGL se sem limite de categorias)
+    fig = create_ranking_chart(
+        media_rating_por_restaurante,
+        'Restaurant Name',
+        'Aggregate rating',
+        max_categories=max_categories,
+        ascending=top_asc,
+        textposition='inside',
+        textinfo='value+percent initial',
+        opacity=0.65,
+        marker={"color": "#008B8B"}
+    )
+
+    fig.update_layout(
+        yaxis_title='Restaurante',
+        xaxis_title='Média do Aggregate rating'
+    )
+
+    return fig
+
+#===================================================
+# Visão de Culinárias
+#===================================================
+
+def best_restaurant_by_cuisine(query, n=1):
+    """Função para obter os ``n`` melhores restaurantes por tipo de culinária (empates desempatados pelos votos)."""
+    return engine.top_by_cuisine(query, n)
+
+def avg_rating_by_cuisine(query, ascending=True):
+    """Função para criar gráfico de barras para médias de avaliações por tipo de culinária."""
+    avg_rating_cuisine = engine.mean_by(query, 'Aggregate rating', 'Cuisines')
+    avg_rating_cuisine = avg_rating_cuisine.sort_values(by='Aggregate rating', ascending=ascending)
+    color_scale = 'YlOrBr' if ascending else 'Blues'
+    fig = create_bar_chart(avg_rating_cuisine, 'Cuisines', 'Aggregate rating',
+                           'Média de Avaliação por Tipo de Culinária', 'Aggregate rating', color_continuous_scale=color_scale,
+                           others='mean', ascending=ascending)
+    return fig
+
+def restaurants_by_online_order(query):
+    """Função para criar gráfico do número de restaurantes que aceitam e não aceitam pedidos online."""
+    if 'Has Online delivery' not in load_data().columns:
+        st.error("Coluna 'Has Online delivery' não encontrada no DataFrame.")
+        return go.Figure()  # Retorna um gráfico vazio em caso de erro
+
+    online_order_counts = engine.flag_counts(query, 'Has Online delivery').rename(columns={'count': 'Number of Restaurants'})
+    fig = create_bar_chart(online_order_counts, 'Has Online delivery', 'Number of Restaurants',
+                           'Número de Restaurantes por Aceitação de Pedidos Online', 'Has Online delivery', color_continuous_scale='Viridis')
+    fig.update_traces(marker_color='blue')
+    return fig
+
+def restaurants_by_reservation(query):
+    """Função para criar gráfico do número de restaurantes que fazem e não fazem reservas."""
+    if 'Has Table booking' not in load_data().columns:
+        st.error("Coluna 'Has Table booking' não encontrada no DataFrame.")
+        return go.Figure()  # Retorna um gráfico vazio em caso de erro
+
+    reservation_counts = engine.flag_counts(query, 'Has Table booking').rename(columns={'count': 'Number of Restaurants'})
+    fig = create_bar_chart(reservation_counts, 'Has Table booking', 'Number of Restaurants',
+                           'Número de Restaurantes por Reserva', 'Has Table booking', color_continuous_scale='Viridis')
+    fig.update_traces(marker_color='orange')
+    return fig
+
+def flag_combination_label(flags):
+    """Função para descrever uma combinação de serviços (máscara de bits) por extenso."""
+    names = [FLAG_LABELS[column] for column in FLAG_COLUMNS if has_flag(flags, column)]
+    return ' + '.join(names) if names else 'Nenhum serviço'
+
+def rating_by_services(query):
+    """Função para criar gráfico da média de avaliação por combinação de serviços (cor: quantidade de restaurantes)."""
+    combinations = engine.flag_combinations(query)
+    combinations = combinations.assign(Serviços=[flag_combination_label(flags) for flags in combinations['Flags']])
+    combinations = combinations.rename(columns={'count': 'Number of Restaurants'}).sort_values(by='Aggregate rating', ascending=False)
+    fig = create_bar_chart(combinations, 'Serviços', 'Aggregate rating', 'Média de Avaliação por Combinação de Serviços',
+                           'Number of Restaurants', color_continuous_scale='Viridis', others='mean')
+    fig.update_traces(customdata=combinations[['Number of Restaurants', 'Average Cost for two']].to_numpy(),
+                      hovertemplate='%{x}<br>Média de avaliação: %{y:.2f}<br>Restaurantes: %{customdata[0]}<br>Preço médio para dois: %{customdata[1]:.0f}<extra></extra>')
+    return fig
+
+def cuisine_figures(query):
+    """Função para montar todos os gráficos da visão de culinárias."""
+    return {
+        'maiores_medias_culinaria': avg_rating_by_cuisine(query, ascending=False),
+        'menores_medias_culinaria': avg_rating_by_cuisine(query, ascending=True),
+        'pedidos_online': restaurants_by_online_order(query),
+        'reservas': restaurants_by_reservation(query),
+        'avaliacao_por_servicos': rating_by_services(query),
+    }